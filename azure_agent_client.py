@@ -0,0 +1,342 @@
+"""Azure AI Agent Service client with Azure AI Search and Bing Web Grounding tools."""
+
+import os
+import sys
+import time
+from azure.ai.projects import AIProjectClient
+from azure.ai.projects.models import AzureAISearchTool, BingGroundingTool, MessageRole
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError, ServiceRequestError, ServiceResponseError
+from azure.identity import DefaultAzureCredential
+
+import tracing
+from deployment_router import DeploymentRouter
+import postprocess
+
+# Seconds between run status polls when tracing splits a run into phases
+RUN_POLL_INTERVAL = 0.5
+
+class AgentRunError(RuntimeError):
+    """Raised when an agent run finishes with status "failed"."""
+
+class ConnectionNotFoundError(ValueError):
+    """Raised when a project has no connection with the configured name."""
+
+class AzureAIAgentClient:
+    """Client for Azure AI Agent Service with Azure AI Search and Bing Web Grounding tools."""
+    
+    def __init__(self, credential=None, transport=None):
+        """
+        Initialize Azure AI Agent Service client with credentials from environment variables.
+        
+        Args:
+            credential: Optional token credential to share; defaults to a new DefaultAzureCredential
+            transport: Optional azure-core HTTP transport, e.g. one backed by a shared session
+        """
+        print("Initializing Azure AI Agent client...", file=sys.stderr)
+        
+        # Load environment variables
+        self.project_connection_string = os.getenv("PROJECT_CONNECTION_STRING")
+        self.model_deployment_name = os.getenv("MODEL_DEPLOYMENT_NAME")
+        self.search_connection_name = os.getenv("AI_SEARCH_CONNECTION_NAME")
+        self.bing_connection_name = os.getenv("BING_CONNECTION_NAME")
+        self.index_name = os.getenv("AI_SEARCH_INDEX_NAME")
+        
+        # Validate environment variables (AGENT_DEPLOYMENTS replaces the single deployment settings)
+        required_vars = {
+            "AI_SEARCH_CONNECTION_NAME": self.search_connection_name,
+            "BING_CONNECTION_NAME": self.bing_connection_name,
+            "AI_SEARCH_INDEX_NAME": self.index_name
+        }
+        if not os.getenv("AGENT_DEPLOYMENTS"):
+            required_vars["PROJECT_CONNECTION_STRING"] = self.project_connection_string
+            required_vars["MODEL_DEPLOYMENT_NAME"] = self.model_deployment_name
+        
+        missing = [k for k, v in required_vars.items() if not v]
+        if missing:
+            error_msg = f"Missing environment variables: {', '.join(missing)}"
+            print(f"Error: {error_msg}", file=sys.stderr)
+            raise ValueError(error_msg)
+        
+        # Initialize one AIProjectClient per project used by the deployment router
+        try:
+            self.router = DeploymentRouter.from_env(self.model_deployment_name, self.project_connection_string)
+            client_kwargs = {"transport": transport} if transport is not None else {}
+            credential = credential or DefaultAzureCredential()
+            if tracing.enabled:
+                credential = tracing.TracedCredential(credential)
+            self.project_clients = {}
+            for target in self.router.targets:
+                if target.project_connection_string not in self.project_clients:
+                    self.project_clients[target.project_connection_string] = AIProjectClient.from_connection_string(
+                        credential=credential,
+                        conn_str=target.project_connection_string,
+                        **client_kwargs
+                    )
+            self.client = self.project_clients[self.router.targets[0].project_connection_string]
+            print(f"AIProjectClient initialized successfully ({len(self.project_clients)} project(s))", file=sys.stderr)
+        except Exception as e:
+            print(f"Error initializing AIProjectClient: {str(e)}", file=sys.stderr)
+            raise
+        
+        print(f"Azure AI Agent client initialized for AI Search connection: {self.search_connection_name}, Bing connection: {self.bing_connection_name}", file=sys.stderr)
+    
+    def search_index(self, query, top=5):
+        """
+        Perform a search using Azure AI Search Tool (default: best/hybrid mode).
+        
+        Args:
+            query: The search query text
+            top: Maximum number of results to return
+            
+        Returns:
+            Formatted search results
+        """
+        print(f"Performing AI Search for: {query}", file=sys.stderr)
+        
+        try:
+            def make_search_tool(client):
+                # Get Azure AI Search connection
+                search_connection = self._get_connection(client, self.search_connection_name)
+                
+                # Create search tool
+                search_tool = AzureAISearchTool(
+                    index_connection_id=search_connection.id,
+                    index_name=self.index_name
+                )
+                return search_tool.definitions, search_tool.resources
+            
+            with tracing.span("agent.search_index", top=top):
+                return self._run_agent(
+                    name="search-agent",
+                    instructions=f"You are an Azure AI Search expert. Use the Azure AI Search Tool to find the most relevant information for: '{query}'. Return only the top {top} most relevant results. For each result, provide a title, content excerpt, and relevance score if available. Format your response as Markdown with each result clearly separated.",
+                    make_tool=make_search_tool,
+                    query=query,
+                    failure_prefix="Search failed"
+                )
+        
+        except Exception as e:
+            print(f"Error during search: {str(e)}", file=sys.stderr)
+            raise
+    
+    def web_search(self, query):
+        """
+        Perform a web search using Bing Web Grounding Tool.
+        
+        Args:
+            query: The search query text
+            
+        Returns:
+            Formatted search results from the web
+        """
+        print(f"Performing Bing Web search for: {query}", file=sys.stderr)
+        
+        try:
+            def make_bing_tool(client):
+                # Get Bing connection
+                bing_connection = self._get_connection(client, self.bing_connection_name)
+                
+                # Initialize Bing Web Grounding Tool
+                bing_tool = BingGroundingTool(connection_id=bing_connection.id)
+                return bing_tool.definitions, None
+            
+            with tracing.span("agent.web_search"):
+                return self._run_agent(
+                    name="web-search-agent",
+                    instructions=f"You are a helpful web search assistant. Use the Bing Web Grounding Tool to find the most current and accurate information for: '{query}'. Provide a comprehensive answer with citations to sources. Format your response as Markdown.",
+                    make_tool=make_bing_tool,
+                    query=query,
+                    failure_prefix="Web search failed"
+                )
+        
+        except Exception as e:
+            print(f"Error during web search: {str(e)}", file=sys.stderr)
+            raise
+    
+    def routing_stats(self):
+        """Return per-deployment routing statistics (runs, throttles, failures, latency)."""
+        return self.router.stats()
+    
+    @staticmethod
+    def _retry_after(error):
+        """Return the Retry-After seconds of a 429 response, or None if absent or not a number."""
+        retry_after = error.response.headers.get("Retry-After") if error.response is not None else None
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            # Missing, or an HTTP date; the router falls back to its cooldown
+            return None
+    
+    def _get_connection(self, client, connection_name):
+        """Look up a connection by name in the project of `client`; raises ConnectionNotFoundError."""
+        with tracing.span("agent.connection_lookup", connection=connection_name):
+            try:
+                connection = client.connections.get(connection_name=connection_name)
+            except ResourceNotFoundError:
+                connection = None
+        if not connection:
+            raise ConnectionNotFoundError(f"Connection '{connection_name}' not found")
+        return connection
+    
+    def _run_agent(self, name, instructions, make_tool, query, failure_prefix):
+        """
+        Run `query` on a deployment chosen by the router, failing over to another
+        deployment when the chosen one is throttled or unavailable, or its project lacks
+        the tool's connection.
+        
+        Args:
+            name: Name for the temporary agent
+            instructions: Agent instructions
+            make_tool: Function taking an AIProjectClient and returning (tool definitions, tool resources)
+            query: The user message
+            failure_prefix: Prefix of the AgentRunError message raised when the run fails
+        """
+        tried = []
+        last_error = None
+        while True:
+            target = self.router.acquire(exclude=tried)
+            if target is None:
+                # Every deployment was tried; report the last failure
+                raise last_error
+            tried.append(target)
+            client = self.project_clients[target.project_connection_string]
+            started = time.monotonic()
+            
+            try:
+                with tracing.span("agent.attempt", deployment=target.name, attempt=len(tried)):
+                    tools, tool_resources = make_tool(client)
+                    run, result = self._run_agent_on(client, target.deployment, name, instructions,
+                                                     tools, tool_resources, query)
+            except HttpResponseError as e:
+                if e.status_code == 429:
+                    self.router.record_throttle(target, self._retry_after(e))
+                else:
+                    self.router.record_failure(target)
+                    # Only server-side errors are worth retrying on another deployment
+                    if e.status_code is None or e.status_code < 500:
+                        raise
+                last_error = e
+                print(f"Deployment {target.name} unavailable ({e.status_code}), failing over", file=sys.stderr)
+                continue
+            except (ServiceRequestError, ServiceResponseError) as e:
+                self.router.record_failure(target)
+                last_error = e
+                print(f"Deployment {target.name} unreachable, failing over: {str(e)}", file=sys.stderr)
+                continue
+            except ConnectionNotFoundError as e:
+                # Connections are per project; another target's project may have it
+                self.router.record_failure(target)
+                last_error = e
+                print(f"{str(e)} for deployment {target.name}, failing over", file=sys.stderr)
+                continue
+            except Exception:
+                self.router.record_failure(target)
+                raise
+            
+            if run.status == "failed":
+                error_code = getattr(run.last_error, "code", None)
+                if error_code == "rate_limit_exceeded":
+                    self.router.record_throttle(target)
+                    last_error = AgentRunError(f"{failure_prefix}: {run.last_error}")
+                    print(f"Run on {target.name} was rate limited, failing over", file=sys.stderr)
+                    continue
+                self.router.record_failure(target)
+                print(f"Run failed: {run.last_error}", file=sys.stderr)
+                raise AgentRunError(f"{failure_prefix}: {run.last_error}")
+            
+            self.router.record_success(target, time.monotonic() - started)
+            return result
+    
+    def _run_agent_on(self, client, deployment, name, instructions, tools, tool_resources, query):
+        """Create a temporary agent on `deployment`, run `query` on a new thread and return (run, answer)."""
+        # Create agent with the tool
+        with tracing.span("agent.create_agent", model=deployment):
+            agent = client.agents.create_agent(
+                model=deployment,
+                name=name,
+                instructions=instructions,
+                tools=tools,
+                tool_resources=tool_resources,
+                headers={"x-ms-enable-preview": "true"}
+            )
+        
+        try:
+            # Create thread for communication
+            with tracing.span("agent.create_thread"):
+                thread = client.agents.create_thread()
+            
+            # Create message to thread
+            with tracing.span("agent.create_message"):
+                client.agents.create_message(
+                    thread_id=thread.id,
+                    role=MessageRole.USER,
+                    content=query
+                )
+            
+            # Process the run
+            run = self._process_run(client, thread.id, agent.id)
+            if run.status == "failed":
+                return run, None
+            
+            # Get the agent's response
+            with tracing.span("agent.list_messages"):
+                response_message = client.agents.list_messages(thread_id=thread.id).get_last_message_by_role(
+                    MessageRole.AGENT
+                )
+            
+            result = ""
+            if response_message:
+                for text_message in response_message.text_messages:
+                    result += text_message.text.value + "\n"
+                
+                # Include any citations, once per normalized URL
+                citations = postprocess.dedupe_citations(
+                    (annotation.url_citation.title, annotation.url_citation.url)
+                    for annotation in response_message.url_citation_annotations
+                )
+                for title, url in citations:
+                    result += f"\nCitation: [{title}]({url})\n"
+            
+            return run, result
+        
+        finally:
+            # Clean up resources; a failed cleanup must not discard the answer or trigger failover
+            try:
+                with tracing.span("agent.delete_agent"):
+                    client.agents.delete_agent(agent.id)
+            except Exception as e:
+                print(f"Error deleting agent {agent.id}: {str(e)}", file=sys.stderr)
+    
+    def _process_run(self, client, thread_id, agent_id):
+        """
+        Run the agent on a thread until it finishes.
+        
+        With tracing enabled, the run is polled here instead of by create_and_process_run so
+        the time spent queued and the time the model spent running become separate spans.
+        Like create_and_process_run, a run that requires action is cancelled, since these
+        agents have no client-side tools to run.
+        """
+        if not tracing.enabled:
+            return client.agents.create_and_process_run(
+                thread_id=thread_id,
+                agent_id=agent_id
+            )
+        
+        with tracing.span("agent.run"):
+            with tracing.span("agent.create_run"):
+                run = client.agents.create_run(thread_id=thread_id, agent_id=agent_id)
+            
+            # Record one span per run status (queued, in_progress, ...)
+            status, status_started = run.status, time.time_ns()
+            while run.status in ("queued", "in_progress", "requires_action"):
+                time.sleep(RUN_POLL_INTERVAL)
+                run = client.agents.get_run(thread_id=thread_id, run_id=run.id)
+                if run.status != status:
+                    now = time.time_ns()
+                    tracing.record_span(f"agent.run.{status}", status_started, now)
+                    status, status_started = run.status, now
+                if run.status == "requires_action":
+                    print(f"Run {run.id} requires action - cancelling run", file=sys.stderr)
+                    with tracing.span("agent.cancel_run"):
+                        run = client.agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                    break
+            return run
@@ -11,6 +11,8 @@ from azure.ai.projects import AIProjectClient
 from azure.ai.agents.models import BingGroundingTool, MessageRole
 from azure.identity import DefaultAzureCredential
 
+import postprocess
+
 # Add startup message
 print("Starting Azure AI Agent Service MCP Server...", file=sys.stderr)
 
@@ -156,9 +158,13 @@ class AzureAIAgentClient:
                 for text_message in response_message.text_messages:
                     result += text_message.text.value + "\n"
                 
-                # Include any citations
-                for annotation in response_message.url_citation_annotations:
-                    result += f"\nCitation: [{annotation.url_citation.title}]({annotation.url_citation.url})\n"
+                # Include any citations, once per normalized URL
+                citations = postprocess.dedupe_citations(
+                    (annotation.url_citation.title, annotation.url_citation.url)
+                    for annotation in response_message.url_citation_annotations
+                )
+                for title, url in citations:
+                    result += f"\nCitation: [{title}]({url})\n"
             
             self.client.agents.delete_agent(agent.id)
             
@@ -0,0 +1,276 @@
+"""Azure AI Search client shared by the search MCP servers."""
+
+import os
+import sys
+import json
+import time
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents import SearchClient
+from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery
+from query_embeddings import create_embedder_from_env
+import tracing
+import postprocess
+
+# Vector query tuning. k_nearest_neighbors is sized from the requested `top`
+# (top * multiplier, clamped to [min, max]) instead of a fixed 50, so small
+# result sets don't over-fetch and large ones keep enough candidates for recall.
+DEFAULT_KNN_MULTIPLIER = 10
+DEFAULT_KNN_MIN = 10
+DEFAULT_KNN_MAX = 200
+DEFAULT_VECTOR_FIELDS = "text_vector"
+DEFAULT_TARGET_RECALL = 0.95
+
+class AzureSearchClient:
+    """Client for Azure AI Search service."""
+    
+    def __init__(self, embedder=None, credential=None, transport=None):
+        """
+        Initialize Azure Search client with credentials from environment variables.
+        
+        Args:
+            embedder: Optional query embedder with `embed`/`embed_many` (see query_embeddings.py).
+                When omitted, one is created from AZURE_SEARCH_QUERY_EMBEDDER; if that is unset,
+                the search service vectorizes query text.
+            credential: Optional credential to use instead of AZURE_SEARCH_API_KEY
+            transport: Optional azure-core HTTP transport, e.g. one backed by a shared session
+        """
+        print("Initializing Azure Search client...", file=sys.stderr)
+        # Load environment variables
+        self.endpoint = os.getenv("AZURE_SEARCH_SERVICE_ENDPOINT")
+        self.index_name = os.getenv("AZURE_SEARCH_INDEX_NAME")  # Modified to use AZURE_SEARCH_INDEX
+        api_key = os.getenv("AZURE_SEARCH_API_KEY")
+        
+        # Validate environment variables
+        if not all([self.endpoint, self.index_name, api_key or credential]):
+            missing = []
+            if not self.endpoint:
+                missing.append("AZURE_SEARCH_SERVICE_ENDPOINT")
+            if not self.index_name:
+                missing.append("AZURE_SEARCH_INDEX")
+            if not (api_key or credential):
+                missing.append("AZURE_SEARCH_API_KEY")
+            error_msg = f"Missing environment variables: {', '.join(missing)}"
+            print(f"Error: {error_msg}", file=sys.stderr)
+            raise ValueError(error_msg)
+        
+        # Initialize the search client
+        print(f"Connecting to Azure AI Search at {self.endpoint}", file=sys.stderr)
+        self.credential = AzureKeyCredential(api_key) if api_key else credential
+        if tracing.enabled and hasattr(self.credential, "get_token"):
+            self.credential = tracing.TracedCredential(self.credential)
+        client_kwargs = {"transport": transport} if transport is not None else {}
+        self.search_client = SearchClient(
+            endpoint=self.endpoint,
+            index_name=self.index_name,
+            credential=self.credential,
+            **client_kwargs
+        )
+        print(f"Azure Search client initialized for index: {self.index_name}", file=sys.stderr)
+        
+        # Vector query settings
+        self.knn_multiplier = int(os.getenv("AZURE_SEARCH_KNN_MULTIPLIER", DEFAULT_KNN_MULTIPLIER))
+        self.knn_min = int(os.getenv("AZURE_SEARCH_KNN_MIN", DEFAULT_KNN_MIN))
+        self.knn_max = int(os.getenv("AZURE_SEARCH_KNN_MAX", DEFAULT_KNN_MAX))
+        self.vector_fields = os.getenv("AZURE_SEARCH_VECTOR_FIELDS", DEFAULT_VECTOR_FIELDS)
+        vector_mode = os.getenv("AZURE_SEARCH_VECTOR_MODE", "approximate").lower()
+        if vector_mode not in ("approximate", "exhaustive"):
+            error_msg = f"Invalid AZURE_SEARCH_VECTOR_MODE: {vector_mode} (expected 'approximate' or 'exhaustive')"
+            print(f"Error: {error_msg}", file=sys.stderr)
+            raise ValueError(error_msg)
+        self.exhaustive = vector_mode == "exhaustive"
+        self.tuning_log = os.getenv("AZURE_SEARCH_KNN_TUNING_LOG")
+        # Field shared by all chunks of one source document, e.g. parent_id with integrated
+        # vectorization. Chunks are only merged when they share it, so merging is off by default
+        # (selecting a field the index doesn't have fails every query).
+        self.document_key_field = os.getenv("AZURE_SEARCH_DOCUMENT_KEY_FIELD", "")
+        self.select_fields = ["title", "chunk"] + ([self.document_key_field] if self.document_key_field else [])
+        self.embedder = embedder if embedder is not None else create_embedder_from_env(
+            get_credential=(lambda: credential) if credential is not None else None)
+        print(f"Vector queries: fields={self.vector_fields}, mode={vector_mode}, "
+              f"kNN=top*{self.knn_multiplier} in [{self.knn_min}, {self.knn_max}]", file=sys.stderr)
+    
+    def keyword_search(self, query, top=5, skip=0):
+        """Perform keyword search on the index, skipping the first `skip` results."""
+        print(f"Performing keyword search for: {query}", file=sys.stderr)
+        with tracing.span("search.keyword", index=self.index_name, top=top, skip=skip):
+            results = self.search_client.search(
+                search_text=query,
+                top=top,
+                skip=skip,
+                select=self.select_fields
+            )
+            return self._format_results(results)
+    
+    def vector_search(self, query, top=5, vector_field=None, vector=None, exhaustive=None, k_nearest_neighbors=None, skip=0):
+        """
+        Perform vector search on the index.
+        
+        Args:
+            query: The search query text (vectorized by the service unless `vector` is given)
+            top: Maximum number of results to return
+            vector_field: Vector field name, comma-separated names or list of names (default: AZURE_SEARCH_VECTOR_FIELDS)
+            vector: Optional precomputed query embedding (computed client-side when an embedder is configured)
+            exhaustive: Force exhaustive (True) or approximate (False) kNN; default from AZURE_SEARCH_VECTOR_MODE
+            k_nearest_neighbors: Override the adaptive kNN size
+            skip: Number of results to skip, for paging
+        """
+        print(f"Performing vector search for: {query}", file=sys.stderr)
+        with tracing.span("search.vector", index=self.index_name, top=top, skip=skip):
+            results = self.search_client.search(
+                vector_queries=[self._build_vector_query(query, top + skip, vector_field, vector, exhaustive, k_nearest_neighbors)],
+                top=top,
+                skip=skip,
+                select=self.select_fields
+            )
+            return self._format_results(results)
+    
+    def hybrid_search(self, query, top=5, vector_field=None, vector=None, exhaustive=None, k_nearest_neighbors=None, skip=0):
+        """Perform hybrid search (keyword + vector) on the index. Vector arguments match `vector_search`."""
+        print(f"Performing hybrid search for: {query}", file=sys.stderr)
+        with tracing.span("search.hybrid", index=self.index_name, top=top, skip=skip):
+            results = self.search_client.search(
+                search_text=query,
+                vector_queries=[self._build_vector_query(query, top + skip, vector_field, vector, exhaustive, k_nearest_neighbors)],
+                top=top,
+                skip=skip,
+                select=self.select_fields
+            )
+            return self._format_results(results)
+    
+    def knn_for_top(self, top):
+        """Return the k_nearest_neighbors to request for a given `top`."""
+        return max(top, min(self.knn_max, max(self.knn_min, top * self.knn_multiplier)))
+    
+    def batch_search(self, queries, top=5, mode="hybrid"):
+        """
+        Run a vector or hybrid search for each query, embedding all queries in one batch first.
+        
+        Args:
+            queries: The search query texts
+            top: Maximum number of results to return per query
+            mode: "vector" or "hybrid"
+        
+        Returns:
+            A list of formatted result lists, one per query
+        """
+        if mode not in ("vector", "hybrid"):
+            raise ValueError(f"Invalid batch search mode: {mode} (expected 'vector' or 'hybrid')")
+        search = self.vector_search if mode == "vector" else self.hybrid_search
+        vectors = self.embedder.embed_many(queries) if self.embedder else [None] * len(queries)
+        return [search(query, top, vector=vector) for query, vector in zip(queries, vectors)]
+    
+    def _build_vector_query(self, query, top, vector_field=None, vector=None, exhaustive=None, k_nearest_neighbors=None):
+        """Build the vector query for a search, using a precomputed vector when one is given."""
+        if vector_field is None:
+            vector_field = self.vector_fields
+        elif not isinstance(vector_field, str):
+            vector_field = ",".join(vector_field)
+        if exhaustive is None:
+            exhaustive = self.exhaustive
+        if k_nearest_neighbors is None:
+            k_nearest_neighbors = self.knn_for_top(top)
+        if vector is None and self.embedder is not None:
+            with tracing.span("search.embed", embedder=self.embedder.name):
+                vector = self.embedder.embed(query)
+        
+        if vector is not None:
+            return VectorizedQuery(
+                vector=list(vector),
+                k_nearest_neighbors=k_nearest_neighbors,
+                fields=vector_field,
+                exhaustive=exhaustive
+            )
+        return VectorizableTextQuery(
+            text=query,
+            k_nearest_neighbors=k_nearest_neighbors,
+            fields=vector_field,
+            exhaustive=exhaustive
+        )
+    
+    def measure_knn_tradeoff(self, query, top=5, knn_values=(5, 10, 25, 50, 100, 200), vector_field=None):
+        """
+        Measure recall and latency of approximate vector search for several kNN sizes.
+        
+        Exhaustive search results are used as ground truth. Each measurement is printed
+        to stderr and, when AZURE_SEARCH_KNN_TUNING_LOG is set, appended to that file as
+        a JSON line so AZURE_SEARCH_KNN_MULTIPLIER can be tuned per index.
+        
+        Args:
+            query: The search query text
+            top: Number of results to compare
+            knn_values: kNN sizes to measure with approximate search
+            vector_field: Vector field(s) to search (default: AZURE_SEARCH_VECTOR_FIELDS)
+        
+        Returns:
+            A list of measurements, one per kNN size (exhaustive baseline first)
+        """
+        print(f"Measuring kNN recall/latency for: {query}", file=sys.stderr)
+        
+        def timed_search(k, exhaustive):
+            started = time.perf_counter()
+            results = self.vector_search(query, top, vector_field=vector_field,
+                                         exhaustive=exhaustive, k_nearest_neighbors=k)
+            return results, (time.perf_counter() - started) * 1000
+        
+        truth, truth_latency = timed_search(max(max(knn_values), top), True)
+        truth_keys = {(r["title"], r["content"]) for r in truth}
+        measurements = [{"k": max(max(knn_values), top), "mode": "exhaustive",
+                         "latency_ms": round(truth_latency, 1), "recall": 1.0}]
+        for k in sorted(knn_values):
+            results, latency = timed_search(max(k, top), False)
+            found = {(r["title"], r["content"]) for r in results}
+            recall = len(found & truth_keys) / len(truth_keys) if truth_keys else 1.0
+            measurements.append({"k": max(k, top), "mode": "approximate",
+                                 "latency_ms": round(latency, 1), "recall": round(recall, 3)})
+        
+        target = float(os.getenv("AZURE_SEARCH_KNN_TARGET_RECALL", DEFAULT_TARGET_RECALL))
+        recommended = next((m["k"] for m in measurements[1:] if m["recall"] >= target), None)
+        for m in measurements:
+            print(f"  k={m['k']:<4} {m['mode']:<11} recall@{top}={m['recall']:.3f} latency={m['latency_ms']:.1f}ms",
+                  file=sys.stderr)
+        if recommended is not None:
+            print(f"Smallest k reaching recall {target}: {recommended} "
+                  f"(multiplier ~{recommended / top:.1f} for top={top})", file=sys.stderr)
+        
+        if self.tuning_log:
+            with open(self.tuning_log, "a", encoding="utf-8") as f:
+                for m in measurements:
+                    record = {"ts": time.time(), "index": self.index_name, "query": query, "top": top,
+                              "fields": vector_field or self.vector_fields, **m}
+                    f.write(json.dumps(record) + "\n")
+        
+        return measurements
+
+    def _format_results(self, results):
+        """Format search results for better readability."""
+        formatted_results = []
+        # Results are paged lazily, so this loop is where the search request is sent
+        with tracing.span("search.fetch_results"):
+            results = list(results)
+        for result in results:
+            item = {
+                "title": result.get("title", "Unknown"),
+                "content": result.get("chunk", "")[:1000],  # Limit content length
+                "score": result.get("@search.score", 0),
+                "document": result.get(self.document_key_field) if self.document_key_field else None
+            }
+            formatted_results.append(item)
+        
+        print(f"Formatted {len(formatted_results)} search results", file=sys.stderr)
+        return formatted_results
+
+def format_results_as_markdown(results, search_type):
+    """Format search results as markdown for better readability."""
+    results = postprocess.merge_chunks(results)
+    if not results:
+        return f"No results found for your query using {search_type}."
+    
+    markdown = f"## {search_type} Results\n\n"
+    
+    for i, result in enumerate(results, 1):
+        markdown += f"### {i}. {result['title']}\n"
+        markdown += f"Score: {result['score']:.2f}\n\n"
+        markdown += f"{result['content']}\n\n"
+        markdown += "---\n\n"
+    
+    return markdown
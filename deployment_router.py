@@ -0,0 +1,153 @@
+"""Route agent runs across several model deployments and projects by live latency, throttling and cost."""
+
+import os
+import sys
+import json
+import time
+import random
+import threading
+
+DEFAULT_COOLDOWN = 30.0
+DEFAULT_COST_WEIGHT = 1.0
+# Smoothing factor for the latency and throttle-rate moving averages
+EWMA_ALPHA = 0.2
+# Latency assumed for a deployment before any run has completed on it
+INITIAL_LATENCY = 5.0
+
+class DeploymentTarget:
+    """One model deployment in one project, with its live routing statistics."""
+
+    def __init__(self, deployment, project_connection_string, cost=1.0, name=None):
+        self.deployment = deployment
+        self.project_connection_string = project_connection_string
+        self.cost = cost
+        self.name = name or deployment
+        self.latency = None
+        self.throttle_rate = 0.0
+        self.inflight = 0
+        self.cooldown_until = 0.0
+        self.counters = {"runs": 0, "succeeded": 0, "throttled": 0, "failed": 0}
+
+    def score(self, cost_weight):
+        """Expected cost of sending the next run here; lower is better."""
+        latency = self.latency if self.latency is not None else INITIAL_LATENCY
+        return latency * (1 + self.inflight) * (self.cost ** cost_weight) / max(0.05, 1.0 - self.throttle_rate)
+
+class DeploymentRouter:
+    """
+    Pick a deployment for each run and learn from the outcome.
+
+    Each target's score combines its moving-average latency, in-flight runs, recent
+    429 rate and relative cost. Targets are chosen at random with probability inversely
+    proportional to their score, so load spreads across healthy deployments instead of
+    piling onto the single best one. A throttled target sits out a cooldown period.
+    """
+
+    def __init__(self, targets, cooldown=DEFAULT_COOLDOWN, cost_weight=DEFAULT_COST_WEIGHT):
+        if not targets:
+            raise ValueError("At least one deployment target is required")
+        self.targets = targets
+        self.cooldown = cooldown
+        self.cost_weight = cost_weight
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    @classmethod
+    def from_env(cls, default_deployment, default_connection_string):
+        """
+        Create a router from AGENT_DEPLOYMENTS, or a single-target router from the defaults.
+
+        AGENT_DEPLOYMENTS is a JSON list (or the path of a JSON file) of objects with
+        "deployment", optional "project_connection_string" (default: PROJECT_CONNECTION_STRING),
+        optional "cost" (relative, default 1) and optional "name".
+        """
+        config = os.getenv("AGENT_DEPLOYMENTS")
+        if not config:
+            return cls([DeploymentTarget(default_deployment, default_connection_string)])
+
+        if not config.lstrip().startswith("["):
+            with open(config, encoding="utf-8") as f:
+                config = f.read()
+        targets = []
+        for entry in json.loads(config):
+            connection_string = entry.get("project_connection_string", default_connection_string)
+            if not entry.get("deployment") or not connection_string:
+                raise ValueError(f"Deployment entry needs 'deployment' and a project connection string: {entry}")
+            targets.append(DeploymentTarget(entry["deployment"], connection_string,
+                                            cost=float(entry.get("cost", 1.0)), name=entry.get("name")))
+
+        router = cls(
+            targets,
+            cooldown=float(os.getenv("AGENT_ROUTING_COOLDOWN", DEFAULT_COOLDOWN)),
+            cost_weight=float(os.getenv("AGENT_ROUTING_COST_WEIGHT", DEFAULT_COST_WEIGHT))
+        )
+        print(f"Routing agent runs across {len(targets)} deployments: {', '.join(t.name for t in targets)}",
+              file=sys.stderr)
+        return router
+
+    def acquire(self, exclude=()):
+        """
+        Choose a target for a run and count it as in flight.
+
+        Args:
+            exclude: Targets already tried for this run
+
+        Returns:
+            A DeploymentTarget, or None when every target has been tried
+        """
+        with self._lock:
+            candidates = [t for t in self.targets if t not in exclude]
+            if not candidates:
+                return None
+            now = time.monotonic()
+            available = [t for t in candidates if t.cooldown_until <= now]
+            if available:
+                weights = [1.0 / t.score(self.cost_weight) for t in available]
+                target = self._random.choices(available, weights=weights)[0]
+            else:
+                # Everything is cooling down: use the target that recovers first
+                target = min(candidates, key=lambda t: t.cooldown_until)
+            target.inflight += 1
+            target.counters["runs"] += 1
+            return target
+
+    def record_success(self, target, latency):
+        """Record a completed run and its latency in seconds."""
+        with self._lock:
+            target.inflight -= 1
+            target.counters["succeeded"] += 1
+            target.latency = latency if target.latency is None else \
+                EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * target.latency
+            target.throttle_rate *= (1 - EWMA_ALPHA)
+
+    def record_throttle(self, target, retry_after=None):
+        """Record a 429 and take the target out of rotation for a cooldown period."""
+        with self._lock:
+            target.inflight -= 1
+            target.counters["throttled"] += 1
+            target.throttle_rate = EWMA_ALPHA + (1 - EWMA_ALPHA) * target.throttle_rate
+            cooldown = retry_after if retry_after is not None else self.cooldown
+            target.cooldown_until = time.monotonic() + cooldown
+        print(f"Deployment {target.name} throttled; cooling down for {cooldown}s", file=sys.stderr)
+
+    def record_failure(self, target):
+        """Record a run that failed for a reason other than throttling."""
+        with self._lock:
+            target.inflight -= 1
+            target.counters["failed"] += 1
+
+    def stats(self):
+        """Return per-target routing statistics."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                t.name: {
+                    **t.counters,
+                    "latency_ms": round(t.latency * 1000) if t.latency is not None else None,
+                    "throttle_rate": round(t.throttle_rate, 3),
+                    "inflight": t.inflight,
+                    "cooling_down": t.cooldown_until > now,
+                    "cost": t.cost,
+                }
+                for t in self.targets
+            }
@@ -0,0 +1,106 @@
+"""Offline stand-ins for AzureSearchClient and AzureAIAgentClient, used for load tests and local runs."""
+
+import os
+import sys
+import time
+import random
+import hashlib
+
+import postprocess
+
+DEFAULT_LATENCY_MS = 50
+DEFAULT_AGENT_LATENCY_MS = 500
+
+class _FakeBackend:
+    """Simulated latency and error injection shared by the fake clients."""
+
+    def __init__(self, latency_ms, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def _simulate(self, operation):
+        # Latency varies +/-50% around the configured mean
+        time.sleep(self.latency_ms * self._random.uniform(0.5, 1.5) / 1000)
+        if self._random.random() < self.error_rate:
+            raise RuntimeError(f"Simulated {operation} failure")
+
+    @staticmethod
+    def _seed(query):
+        return int(hashlib.sha1(query.encode("utf-8")).hexdigest()[:8], 16)
+
+class FakeSearchClient(_FakeBackend):
+    """Deterministic fake of AzureSearchClient; results depend only on the query, top and skip."""
+
+    def __init__(self, latency_ms=DEFAULT_LATENCY_MS, error_rate=0.0, documents=20, seed=None):
+        super().__init__(latency_ms, error_rate, seed)
+        self.documents = documents
+
+    @classmethod
+    def from_env(cls):
+        """Create a fake search client from FAKE_BACKEND_* environment variables."""
+        return cls(
+            latency_ms=float(os.getenv("FAKE_BACKEND_LATENCY_MS", DEFAULT_LATENCY_MS)),
+            error_rate=float(os.getenv("FAKE_BACKEND_ERROR_RATE", 0.0))
+        )
+
+    def keyword_search(self, query, top=5, skip=0, **kwargs):
+        """Return fake keyword search results."""
+        return self._search("keyword", query, top, skip)
+
+    def vector_search(self, query, top=5, skip=0, **kwargs):
+        """Return fake vector search results."""
+        return self._search("vector", query, top, skip)
+
+    def hybrid_search(self, query, top=5, skip=0, **kwargs):
+        """Return fake hybrid search results."""
+        return self._search("hybrid", query, top, skip)
+
+    def _search(self, mode, query, top, skip):
+        print(f"Performing fake {mode} search for: {query}", file=sys.stderr)
+        self._simulate(f"{mode} search")
+        seed = self._seed(query)
+        results = []
+        for rank in range(skip, min(skip + top, self.documents)):
+            doc = (seed + rank * 7) % 1000
+            results.append({
+                "title": f"Document {doc}",
+                "content": f"Content of document {doc} matching '{query}'. " * 4,
+                "score": 1.0 / (rank + 1),
+                "document": f"doc-{doc}"
+            })
+        return results
+
+class FakeAgentClient(_FakeBackend):
+    """Deterministic fake of AzureAIAgentClient returning Markdown answers with citations."""
+
+    def __init__(self, latency_ms=DEFAULT_AGENT_LATENCY_MS, error_rate=0.0, seed=None):
+        super().__init__(latency_ms, error_rate, seed)
+
+    @classmethod
+    def from_env(cls):
+        """Create a fake agent client from FAKE_BACKEND_* environment variables."""
+        return cls(
+            latency_ms=float(os.getenv("FAKE_BACKEND_AGENT_LATENCY_MS", DEFAULT_AGENT_LATENCY_MS)),
+            error_rate=float(os.getenv("FAKE_BACKEND_ERROR_RATE", 0.0))
+        )
+
+    def search_index(self, query, top=5):
+        """Return a fake agent answer grounded on the index."""
+        print(f"Performing fake AI Search for: {query}", file=sys.stderr)
+        self._simulate("index search")
+        seed = self._seed(query)
+        return "".join(f"### Document {(seed + i * 7) % 1000}\nExcerpt about '{query}'.\n\n" for i in range(top))
+
+    def web_search(self, query):
+        """Return a fake web answer with citations."""
+        print(f"Performing fake Bing Web search for: {query}", file=sys.stderr)
+        self._simulate("web search")
+        seed = self._seed(query)
+        result = f"Summary of web results for '{query}'.\n"
+        # Like real Bing grounding, the same page can be cited more than once
+        citations = [(f"Source {i}", f"https://example.com/{seed % 97}/{i}") for i in range(3)]
+        citations.append(("Source 0", f"https://www.example.com/{seed % 97}/0/?utm_source=bing"))
+        for title, url in postprocess.dedupe_citations(citations):
+            result += f"\nCitation: [{title}]({url})\n"
+        return result
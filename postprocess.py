@@ -0,0 +1,181 @@
+"""
+Post-processing applied to tool results before they are returned.
+
+Citations are collapsed by normalized URL, and search result chunks from the same
+document (same document key) that repeat or overlap each other are merged using hashed
+word shingles.
+Set RESULT_POSTPROCESSING=false to disable; CHUNK_MERGE_THRESHOLD (default 0.8) is the
+shingle containment above which two chunks count as duplicates.
+"""
+
+import os
+import sys
+import zlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+SHINGLE_SIZE = 4
+# Minimum number of words a chunk's tail must share with another chunk's head to splice them
+MIN_OVERLAP_WORDS = 8
+TRACKING_PARAMS = ("fbclid", "gclid", "msclkid", "ocid", "mc_cid", "mc_eid")
+
+enabled = os.getenv("RESULT_POSTPROCESSING", "true").lower() not in ("0", "false", "no")
+merge_threshold = float(os.getenv("CHUNK_MERGE_THRESHOLD", 0.8))
+
+class PostprocessStats:
+    """Thread-safe totals of what post-processing removed."""
+
+    def __init__(self):
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.citations_removed = 0
+        self.chunks_merged = 0
+        self._lock = threading.Lock()
+
+    def record(self, bytes_before, bytes_after, citations_removed=0, chunks_merged=0):
+        with self._lock:
+            self.bytes_before += bytes_before
+            self.bytes_after += bytes_after
+            self.citations_removed += citations_removed
+            self.chunks_merged += chunks_merged
+
+    def snapshot(self):
+        """Return the totals, including bytes saved."""
+        with self._lock:
+            return {"bytes_before": self.bytes_before, "bytes_after": self.bytes_after,
+                    "bytes_saved": self.bytes_before - self.bytes_after,
+                    "citations_removed": self.citations_removed, "chunks_merged": self.chunks_merged}
+
+stats = PostprocessStats()
+
+def normalize_url(url):
+    """
+    Normalize a URL for duplicate detection: lowercase scheme and host, drop "www.",
+    default ports, fragments, tracking parameters and trailing slashes, and sort the query.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        host = (parts.hostname or "").lower()
+        port = parts.port
+    except ValueError:
+        # Malformed URL or port: compare it as written
+        return url.strip()
+    scheme = parts.scheme.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and (scheme, port) in (("http", 80), ("https", 443)):
+        port = None
+    netloc = f"{host}:{port}" if port else host
+    path = parts.path.rstrip("/")
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS))
+    # http and https versions of a page are the same citation
+    return urlunsplit(("https" if scheme in ("http", "https") else scheme, netloc, path, query, ""))
+
+def dedupe_citations(citations):
+    """
+    Collapse citations that point at the same normalized URL, keeping the first of each.
+
+    Args:
+        citations: Iterable of (title, url) pairs
+
+    Returns:
+        The unique (title, url) pairs in their original order
+    """
+    citations = list(citations)
+    if not enabled:
+        return citations
+    seen = set()
+    unique = []
+    for title, url in citations:
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append((title, url))
+
+    removed = len(citations) - len(unique)
+    if removed:
+        before = sum(_citation_size(title, url) for title, url in citations)
+        after = sum(_citation_size(title, url) for title, url in unique)
+        stats.record(before, after, citations_removed=removed)
+        print(f"Post-processing removed {removed} duplicate citation(s), saved {before - after} bytes", file=sys.stderr)
+    return unique
+
+def merge_chunks(results):
+    """
+    Merge duplicate and overlapping chunks of the same document.
+
+    A chunk whose shingles are mostly contained in another chunk of the same document is
+    dropped in favour of the longer one. Chunks where one ends with the words the other
+    starts with (overlapping chunking windows) are spliced into one. The merged result
+    keeps the best score. Results without a document key are never merged, since titles
+    are not unique.
+
+    Args:
+        results: Formatted search results (dicts with "title", "content", "score" and
+            "document", the key shared by all chunks of one source document)
+
+    Returns:
+        A new list of results
+    """
+    if not enabled or len(results) < 2:
+        return results
+
+    merged = []
+    shingles = []
+    merges = 0
+    for result in results:
+        content = result["content"]
+        words = content.split()
+        result_shingles = _shingles(words)
+        document = result.get("document")
+        for i, kept in enumerate(merged):
+            if document is None or kept.get("document") != document:
+                continue
+            common = len(result_shingles & shingles[i])
+            if not common:
+                continue
+            containment = common / min(len(result_shingles), len(shingles[i]))
+            kept_words = kept["content"].split()
+            if containment >= merge_threshold:
+                if len(words) > len(kept_words):
+                    kept["content"] = content
+                    shingles[i] = result_shingles
+            else:
+                spliced = _splice(kept_words, words) or _splice(words, kept_words)
+                if spliced is None:
+                    continue
+                kept["content"] = " ".join(spliced)
+                shingles[i] = _shingles(spliced)
+            kept["score"] = max(kept["score"], result["score"])
+            merges += 1
+            break
+        else:
+            merged.append(dict(result))
+            shingles.append(result_shingles)
+
+    if merges:
+        before = sum(_result_size(r) for r in results)
+        after = sum(_result_size(r) for r in merged)
+        stats.record(before, after, chunks_merged=merges)
+        print(f"Post-processing merged {merges} chunk(s), saved {before - after} bytes", file=sys.stderr)
+    return merged
+
+def _shingles(words):
+    if len(words) <= SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))}
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+            for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def _splice(first, second):
+    """Join two word lists if the end of `first` repeats the start of `second`."""
+    for n in range(min(len(first), len(second)), MIN_OVERLAP_WORDS - 1, -1):
+        if first[-n:] == second[:n]:
+            return first + second[n:]
+    return None
+
+def _citation_size(title, url):
+    return len(f"\nCitation: [{title}]({url})\n".encode("utf-8"))
+
+def _result_size(result):
+    return len(result["title"].encode("utf-8")) + len(result["content"].encode("utf-8"))
@@ -0,0 +1,188 @@
+"""Speculative prefetching of likely follow-up tool calls into the shared result cache."""
+
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_BUDGET_PER_MINUTE = 20
+DEFAULT_IDLE_WAIT = 5.0
+# How often a waiting prefetch checks whether a foreground call wants its result
+IDLE_POLL_INTERVAL = 0.05
+# Relative cost of one prefetch per tool; agent runs consume model tokens
+DEFAULT_COSTS = {
+    "keyword_search": 1,
+    "vector_search": 1,
+    "hybrid_search": 1,
+    "search_index": 5,
+    "web_search": 5,
+}
+
+class Prefetcher:
+    """
+    Issue low-priority prefetches under a concurrency and cost budget.
+
+    Prefetches never queue: when all workers are busy, or the per-minute cost budget is
+    spent, the prefetch is dropped. A prefetch waits until no foreground tool call is
+    running before it starts, and gives up after `idle_wait` seconds. A foreground call for
+    a key that is still being prefetched joins the prefetch instead of calling the backend again.
+    """
+
+    def __init__(self, cache, max_concurrency=DEFAULT_MAX_CONCURRENCY, budget_per_minute=DEFAULT_BUDGET_PER_MINUTE,
+                 costs=None, idle_wait=DEFAULT_IDLE_WAIT):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.budget_per_minute = budget_per_minute
+        self.costs = costs or DEFAULT_COSTS
+        self.idle_wait = idle_wait
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._foreground_idle = threading.Event()
+        self._foreground_idle.set()
+        self._foreground_calls = 0
+        # key -> (future, event set when a foreground call is waiting for the result)
+        self._inflight = {}
+        self._prefetched = set()
+        self._tokens = float(budget_per_minute)
+        self._refilled_at = time.monotonic()
+        self.counters = {"issued": 0, "completed": 0, "used": 0, "failed": 0,
+                         "dropped_busy": 0, "dropped_budget": 0, "dropped_not_idle": 0, "skipped_cached": 0}
+
+    @classmethod
+    def from_env(cls, cache):
+        """Create a prefetcher from environment variables, or return None unless PREFETCH_ENABLED is set."""
+        if os.getenv("PREFETCH_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        prefetcher = cls(
+            cache,
+            max_concurrency=int(os.getenv("PREFETCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            budget_per_minute=float(os.getenv("PREFETCH_BUDGET_PER_MINUTE", DEFAULT_BUDGET_PER_MINUTE)),
+            idle_wait=float(os.getenv("PREFETCH_IDLE_WAIT", DEFAULT_IDLE_WAIT))
+        )
+        print(f"Speculative prefetch enabled: {prefetcher.max_concurrency} worker(s), "
+              f"budget {prefetcher.budget_per_minute} cost units/minute", file=sys.stderr)
+        return prefetcher
+
+    def foreground_started(self):
+        """Mark a foreground tool call as running; pending prefetches wait for it."""
+        with self._lock:
+            self._foreground_calls += 1
+            self._foreground_idle.clear()
+
+    def foreground_finished(self):
+        """Mark a foreground tool call as finished."""
+        with self._lock:
+            self._foreground_calls -= 1
+            if self._foreground_calls == 0:
+                self._foreground_idle.set()
+
+    def schedule(self, key, call):
+        """
+        Prefetch `call()` into the cache under `key` if the budget allows.
+
+        Args:
+            key: Result cache key; key[0] is the tool name used to look up the cost
+            call: Zero-argument function producing the tool result
+
+        Returns:
+            True if the prefetch was issued
+        """
+        with self._lock:
+            if key in self._inflight or key in self.cache:
+                self.counters["skipped_cached"] += 1
+                return False
+            if len(self._inflight) >= self.max_concurrency:
+                self.counters["dropped_busy"] += 1
+                return False
+            cost = self.costs.get(key[0], 1)
+            if not self._take_budget(cost):
+                self.counters["dropped_budget"] += 1
+                return False
+            wanted = threading.Event()
+            self._inflight[key] = (self._executor.submit(self._run, key, call, wanted), wanted)
+            self.counters["issued"] += 1
+
+        print(f"Prefetching {key}", file=sys.stderr)
+        return True
+
+    def join(self, key):
+        """
+        Wait for an in-flight prefetch of `key` and return its result, counting it as used.
+
+        A prefetch that is still waiting for the server to go idle starts right away.
+
+        Returns:
+            The prefetched result, or None if no prefetch of `key` is in flight or it failed
+        """
+        with self._lock:
+            inflight = self._inflight.get(key)
+        if inflight is None:
+            return None
+        future, wanted = inflight
+        wanted.set()
+        print(f"Joining in-flight prefetch of {key}", file=sys.stderr)
+        try:
+            result = future.result()
+        except Exception:
+            # Cancelled on shutdown
+            return None
+        if result is not None:
+            self.record_hit(key)
+        return result
+
+    def record_hit(self, key):
+        """Count a cache hit on `key` as a used prefetch if a prefetch filled it."""
+        with self._lock:
+            if key in self._prefetched:
+                self._prefetched.discard(key)
+                self.counters["used"] += 1
+
+    def stats(self):
+        """Return prefetch counters, including how many completed prefetches went unused."""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["unused"] = stats["completed"] - stats["used"]
+            stats["inflight"] = len(self._inflight)
+        return stats
+
+    def shutdown(self):
+        """Stop accepting prefetches and drop any that have not started."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _take_budget(self, cost):
+        now = time.monotonic()
+        self._tokens = min(self.budget_per_minute,
+                           self._tokens + (now - self._refilled_at) * self.budget_per_minute / 60.0)
+        self._refilled_at = now
+        if self._tokens < cost:
+            return False
+        self._tokens -= cost
+        return True
+
+    def _run(self, key, call, wanted):
+        try:
+            deadline = time.monotonic() + self.idle_wait
+            while not wanted.is_set() and not self._foreground_idle.wait(IDLE_POLL_INTERVAL):
+                if time.monotonic() >= deadline:
+                    with self._lock:
+                        self.counters["dropped_not_idle"] += 1
+                    return None
+            result = call()
+            self.cache.put(key, result)
+            with self._lock:
+                self._prefetched.add(key)
+                self.counters["completed"] += 1
+                if len(self._prefetched) > 2 * self.cache.maxsize:
+                    # Forget prefetched entries the cache has already evicted
+                    self._prefetched = {k for k in self._prefetched if k in self.cache}
+            return result
+        except Exception as e:
+            print(f"Prefetch of {key} failed: {str(e)}", file=sys.stderr)
+            with self._lock:
+                self.counters["failed"] += 1
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
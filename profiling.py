@@ -0,0 +1,119 @@
+"""
+Per-tool CPU and wall-clock profiles.
+
+MCP_PROFILE selects the mode: "off" (default), "sample" (a background thread samples the
+tool's stack every MCP_PROFILE_INTERVAL_MS and writes collapsed stacks for flame graphs)
+or "cprofile" (deterministic cProfile output). Profiles are written to MCP_PROFILE_DIR,
+and every profiled call appends its wall and CPU time to summary.jsonl there.
+"""
+
+import os
+import sys
+import json
+import time
+import cProfile
+import itertools
+import threading
+import contextlib
+
+DEFAULT_PROFILE_DIR = "profiles"
+DEFAULT_INTERVAL_MS = 5
+
+class _StackSampler(threading.Thread):
+    """Sample one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class ToolProfiler:
+    """Profile tool calls and write the results to disk."""
+
+    def __init__(self, mode, directory=DEFAULT_PROFILE_DIR, interval_ms=DEFAULT_INTERVAL_MS):
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Invalid profiling mode: {mode} (expected 'off', 'sample' or 'cprofile')")
+        self.mode = mode
+        self.directory = directory
+        self.interval = interval_ms / 1000
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        """Create a profiler from MCP_PROFILE* environment variables, or return None when profiling is off."""
+        mode = os.getenv("MCP_PROFILE", "off").lower()
+        if mode == "off":
+            return None
+        profiler = cls(
+            mode,
+            directory=os.getenv("MCP_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+            interval_ms=float(os.getenv("MCP_PROFILE_INTERVAL_MS", DEFAULT_INTERVAL_MS))
+        )
+        print(f"Profiling tool calls ({mode}) to {profiler.directory}", file=sys.stderr)
+        return profiler
+
+    @contextlib.contextmanager
+    def profile(self, tool_name):
+        """Profile the enclosed block as one call of `tool_name`."""
+        base = os.path.join(self.directory, f"{tool_name}-{int(time.time())}-{next(self._counter)}")
+        sampler = None
+        profiler = None
+        if self.mode == "sample":
+            sampler = _StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+        else:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Only one cProfile can be active at a time; record timings only
+                profiler = None
+
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            cpu_ms = (time.thread_time() - cpu_started) * 1000
+            wall_ms = (time.perf_counter() - wall_started) * 1000
+            if sampler is not None:
+                sampler.stop()
+                path = base + ".folded"
+                with open(path, "w", encoding="utf-8") as f:
+                    for stack, count in sorted(sampler.stacks.items(), key=lambda item: -item[1]):
+                        f.write(f"{stack} {count}\n")
+            elif profiler is not None:
+                profiler.disable()
+                path = base + ".prof"
+                profiler.dump_stats(path)
+            else:
+                path = ""
+            self._write_summary({"tool": tool_name, "mode": self.mode, "wall_ms": round(wall_ms, 1),
+                                 "cpu_ms": round(cpu_ms, 1), "profile": os.path.basename(path)})
+
+    def _write_summary(self, record):
+        with self._lock:
+            with open(os.path.join(self.directory, "summary.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        print(f"Profiled {record['tool']}: wall {record['wall_ms']}ms, cpu {record['cpu_ms']}ms -> {record['profile']}",
+              file=sys.stderr)
@@ -0,0 +1,199 @@
+"""Client-side query embedding with a bounded LRU cache for Azure AI Search vector queries."""
+
+import os
+import sys
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_EMBEDDING_DIMENSIONS = 1536
+DEFAULT_EMBEDDING_CACHE_SIZE = 1024
+DEFAULT_AZURE_OPENAI_API_VERSION = "2024-10-21"
+
+class HashEmbedder:
+    """Deterministic local embedder based on feature hashing. Intended for tests and offline runs."""
+
+    def __init__(self, dimensions=DEFAULT_EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hash-{dimensions}"
+
+    def embed(self, text):
+        """Embed a single text."""
+        return self._embed(text)
+
+    def embed_many(self, texts):
+        """Embed a batch of texts."""
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text):
+        vector = [0.0] * self.dimensions
+        for token in text.lower().split():
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+class AzureOpenAIEmbedder:
+    """Embedder backed by an Azure OpenAI embedding deployment."""
+
+    def __init__(self, endpoint, deployment, api_key=None, api_version=DEFAULT_AZURE_OPENAI_API_VERSION, dimensions=None,
+                 credential=None):
+        """
+        Args:
+            endpoint: Azure OpenAI endpoint
+            deployment: Embedding deployment name
+            api_key: API key; Entra ID authentication is used when omitted
+            api_version: Azure OpenAI API version
+            dimensions: Optional embedding dimensions to request
+            credential: Token credential for Entra ID authentication (default: a new DefaultAzureCredential)
+        """
+        from openai import AzureOpenAI
+
+        if api_key:
+            self.client = AzureOpenAI(azure_endpoint=endpoint, api_key=api_key, api_version=api_version)
+        else:
+            from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+            token_provider = get_bearer_token_provider(
+                credential if credential is not None else DefaultAzureCredential(),
+                "https://cognitiveservices.azure.com/.default"
+            )
+            self.client = AzureOpenAI(azure_endpoint=endpoint, azure_ad_token_provider=token_provider,
+                                      api_version=api_version)
+        self.deployment = deployment
+        self.dimensions = dimensions
+        self.name = f"aoai-{deployment}"
+
+    def embed(self, text):
+        """Embed a single text."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        """Embed a batch of texts in a single request."""
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        response = self.client.embeddings.create(model=self.deployment, input=list(texts), **kwargs)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+class EmbeddingCache:
+    """Thread-safe bounded LRU cache of query embeddings."""
+
+    def __init__(self, maxsize=DEFAULT_EMBEDDING_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached vector for `key`, or None."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key, vector):
+        """Store a vector, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+class CachingEmbedder:
+    """Wrap an embedder with an LRU cache; only uncached texts are sent to the embedder."""
+
+    def __init__(self, embedder, cache=None):
+        self.embedder = embedder
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.name = embedder.name
+
+    def embed(self, text):
+        """Embed a single query text."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        """Embed a batch of query texts, deduplicating and batching cache misses."""
+        keys = [self._key(text) for text in texts]
+        vectors = {}
+        missing = []
+        for key in keys:
+            if key in vectors or key in missing:
+                continue
+            vector = self.cache.get(key)
+            if vector is None:
+                missing.append(key)
+            else:
+                vectors[key] = vector
+
+        if missing:
+            print(f"Embedding {len(missing)} query text(s) with {self.name}", file=sys.stderr)
+            for key, vector in zip(missing, self.embedder.embed_many(missing)):
+                self.cache.put(key, vector)
+                vectors[key] = vector
+        return [vectors[key] for key in keys]
+
+    def stats(self):
+        """Return cache hit/miss counters."""
+        return {"size": len(self.cache), "maxsize": self.cache.maxsize,
+                "hits": self.cache.hits, "misses": self.cache.misses}
+
+    @staticmethod
+    def _key(text):
+        return " ".join(text.split())
+
+def create_embedder_from_env(get_credential=None):
+    """
+    Create a caching query embedder from environment variables.
+
+    AZURE_SEARCH_QUERY_EMBEDDER selects the embedder: "service" (default, let the search
+    service vectorize), "hash" (local deterministic stub) or "azure_openai".
+
+    Args:
+        get_credential: Optional function returning the token credential to use for
+            Azure OpenAI when no AZURE_OPENAI_API_KEY is set; only called in that case
+
+    Returns:
+        A CachingEmbedder, or None when the service should vectorize queries
+    """
+    kind = os.getenv("AZURE_SEARCH_QUERY_EMBEDDER", "service").lower()
+    if kind == "service":
+        return None
+
+    dimensions = os.getenv("AZURE_SEARCH_QUERY_EMBEDDING_DIMENSIONS")
+    cache = EmbeddingCache(int(os.getenv("AZURE_SEARCH_QUERY_EMBEDDING_CACHE_SIZE", DEFAULT_EMBEDDING_CACHE_SIZE)))
+
+    if kind == "hash":
+        embedder = HashEmbedder(int(dimensions) if dimensions else DEFAULT_EMBEDDING_DIMENSIONS)
+    elif kind == "azure_openai":
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+        deployment = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+        missing = [k for k, v in {"AZURE_OPENAI_ENDPOINT": endpoint,
+                                  "AZURE_OPENAI_EMBEDDING_DEPLOYMENT": deployment}.items() if not v]
+        if missing:
+            error_msg = f"Missing environment variables: {', '.join(missing)}"
+            print(f"Error: {error_msg}", file=sys.stderr)
+            raise ValueError(error_msg)
+        api_key = os.getenv("AZURE_OPENAI_API_KEY")
+        embedder = AzureOpenAIEmbedder(
+            endpoint=endpoint,
+            deployment=deployment,
+            api_key=api_key,
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", DEFAULT_AZURE_OPENAI_API_VERSION),
+            dimensions=int(dimensions) if dimensions else None,
+            credential=get_credential() if get_credential is not None and not api_key else None
+        )
+    else:
+        error_msg = f"Invalid AZURE_SEARCH_QUERY_EMBEDDER: {kind} (expected 'service', 'hash' or 'azure_openai')"
+        print(f"Error: {error_msg}", file=sys.stderr)
+        raise ValueError(error_msg)
+
+    print(f"Client-side query embeddings enabled: {embedder.name} (cache size {cache.maxsize})", file=sys.stderr)
+    return CachingEmbedder(embedder, cache)
@@ -0,0 +1,131 @@
+"""
+Replay a recorded workload log against an MCP server over stdio and report latency and errors.
+
+Record a workload by starting unified_server.py with WORKLOAD_RECORD_FILE set, then replay it:
+
+python replay_workload.py workload.jsonl --speed 2
+python replay_workload.py workload.jsonl --concurrency 8 --fake
+"""
+
+import os
+import sys
+import math
+import time
+import asyncio
+import argparse
+import itertools
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from workload import load_workload
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+async def _call(session, record, results):
+    """Call one recorded tool and store (tool, latency_ms, error)."""
+    started = time.perf_counter()
+    try:
+        result = await session.call_tool(record["tool"], record["args"])
+        # The server flags failed backend calls with isError
+        error = bool(result.isError)
+    except Exception as e:
+        print(f"Call to {record['tool']} failed: {e}", file=sys.stderr)
+        error = True
+    results.append((record["tool"], (time.perf_counter() - started) * 1000, error))
+
+async def replay_timed(session, records, speed):
+    """
+    Open-loop replay: issue each call at its recorded offset divided by `speed`.
+
+    Recording sessions in the log are replayed one after another, each on its own timeline.
+    """
+    results = []
+    for _, session_records in itertools.groupby(records, key=lambda record: record.get("s", 0)):
+        session_records = list(session_records)
+        started = time.monotonic()
+        first = session_records[0]["t"]
+        tasks = []
+        for record in session_records:
+            delay = (record["t"] - first) / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_call(session, record, results)))
+        await asyncio.gather(*tasks)
+    return results
+
+async def replay_concurrent(session, records, concurrency):
+    """Closed-loop replay: `concurrency` workers issue calls back to back, ignoring recorded timing."""
+    results = []
+    queue = asyncio.Queue()
+    for record in records:
+        queue.put_nowait(record)
+
+    async def worker():
+        while not queue.empty():
+            await _call(session, queue.get_nowait(), results)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+def report(results, elapsed):
+    """Print latency percentiles and error rates, overall and per tool."""
+    print(f"{'tool':<16} {'calls':>6} {'errors':>7} {'err%':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    groups = {}
+    for tool, latency, error in results:
+        groups.setdefault(tool, []).append((latency, error))
+    groups["ALL"] = [(latency, error) for _, latency, error in results]
+    for tool, calls in groups.items():
+        latencies = [latency for latency, _ in calls]
+        errors = sum(1 for _, error in calls if error)
+        print(f"{tool:<16} {len(calls):>6} {errors:>7} {100 * errors / len(calls):>5.1f}% "
+              f"{percentile(latencies, 50):>7.0f}ms {percentile(latencies, 90):>7.0f}ms "
+              f"{percentile(latencies, 99):>7.0f}ms {max(latencies):>7.0f}ms")
+    print(f"\n{len(results)} calls in {elapsed:.1f}s ({len(results) / elapsed:.1f} calls/s)")
+
+async def replay(args):
+    """Start the server, replay the workload and print the report."""
+    records = load_workload(args.log)
+    if args.tools:
+        records = [r for r in records if r["tool"] in args.tools.split(",")]
+    if not records:
+        print("No calls to replay")
+        return
+    print(f"Replaying {len(records)} calls from {args.log} against: {args.server}")
+
+    env = dict(os.environ)
+    env.pop("WORKLOAD_RECORD_FILE", None)
+    if args.fake:
+        env["UNIFIED_SERVER_BACKEND"] = "fake"
+    command, *server_args = args.server.split()
+    server_params = StdioServerParameters(command=command, args=server_args, env=env)
+
+    async with stdio_client(server_params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            started = time.monotonic()
+            if args.concurrency:
+                results = await replay_concurrent(session, records, args.concurrency)
+            else:
+                results = await replay_timed(session, records, args.speed)
+            report(results, time.monotonic() - started)
+
+def main():
+    """Parse arguments and run the replay."""
+    parser = argparse.ArgumentParser(description="Replay a recorded MCP tool workload")
+    parser.add_argument("log", help="Workload log written via WORKLOAD_RECORD_FILE (.jsonl or .jsonl.gz)")
+    parser.add_argument("--server", default="python unified_server.py", help="Server command line")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier for timed replay")
+    parser.add_argument("--concurrency", type=int, help="Replay with a fixed number of concurrent calls instead")
+    parser.add_argument("--tools", help="Comma-separated tools to replay (default: all)")
+    parser.add_argument("--fake", action="store_true", help="Run the server against offline fake backends")
+    args = parser.parse_args()
+    asyncio.run(replay(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Credential, HTTP connection pool and caches shared by the tools of the unified MCP server."""
+
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from azure.core.pipeline.transport import RequestsTransport
+from azure.identity import DefaultAzureCredential
+
+from query_embeddings import create_embedder_from_env
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RESULT_CACHE_SIZE = 256
+DEFAULT_RESULT_CACHE_TTL = 300
+
+class ResultCache:
+    """Thread-safe LRU cache of tool results with a time-to-live."""
+
+    def __init__(self, maxsize=DEFAULT_RESULT_CACHE_SIZE, ttl=DEFAULT_RESULT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for `key`, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry when full."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SharedResources:
+    """One credential, HTTP session and set of caches for every client in the process."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, result_cache=None, embedder=None):
+        """
+        Args:
+            pool_size: HTTP connections kept per host
+            result_cache: Tool result cache (default: a ResultCache with default settings)
+            embedder: Query embedder for the search client (default: created from
+                AZURE_SEARCH_QUERY_EMBEDDER on first use)
+        """
+        self._credential = None
+        self._credential_lock = threading.Lock()
+        self._embedder = embedder
+        self._embedder_created = embedder is not None
+        self._embedder_lock = threading.Lock()
+
+        # One pooled session; each Azure SDK client gets its own transport on top of it
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.result_cache = result_cache if result_cache is not None else ResultCache()
+
+    @classmethod
+    def from_env(cls):
+        """Create shared resources configured from environment variables."""
+        pool_size = int(os.getenv("UNIFIED_SERVER_POOL_SIZE", DEFAULT_POOL_SIZE))
+        result_cache = ResultCache(
+            maxsize=int(os.getenv("UNIFIED_SERVER_CACHE_SIZE", DEFAULT_RESULT_CACHE_SIZE)),
+            ttl=float(os.getenv("UNIFIED_SERVER_CACHE_TTL", DEFAULT_RESULT_CACHE_TTL))
+        )
+        print(f"Shared resources: pool size {pool_size}, result cache {result_cache.maxsize} entries / "
+              f"{result_cache.ttl}s TTL", file=sys.stderr)
+        return cls(pool_size=pool_size, result_cache=result_cache)
+
+    @property
+    def credential(self):
+        """The shared DefaultAzureCredential, created on first use."""
+        with self._credential_lock:
+            if self._credential is None:
+                print("Creating shared DefaultAzureCredential", file=sys.stderr)
+                self._credential = DefaultAzureCredential()
+            return self._credential
+
+    @property
+    def embedder(self):
+        """
+        The shared query embedder, created on first use so only the search tools depend on
+        its settings. Raises ValueError for invalid AZURE_SEARCH_QUERY_EMBEDDER settings.
+        """
+        with self._embedder_lock:
+            if not self._embedder_created:
+                # The Azure OpenAI query embedder authenticates with the shared credential too
+                self._embedder = create_embedder_from_env(get_credential=lambda: self.credential)
+                self._embedder_created = True
+            return self._embedder
+
+    def transport(self):
+        """Return a new azure-core transport that borrows the shared session's connection pool."""
+        return RequestsTransport(session=self.session, session_owner=False)
+
+    def close(self):
+        """Release the credential and pooled connections."""
+        if self._credential is not None:
+            self._credential.close()
+        self.session.close()
@@ -0,0 +1,74 @@
+"""
+Offline checks for client-side query embeddings, using the deterministic HashEmbedder.
+
+Runs without Azure credentials or network access:
+python test_query_embeddings.py
+"""
+
+import os
+from query_embeddings import HashEmbedder, CachingEmbedder, EmbeddingCache
+
+class CountingEmbedder(HashEmbedder):
+    """HashEmbedder that records every batch it is asked to embed."""
+
+    def __init__(self):
+        super().__init__(dimensions=16)
+        self.batches = []
+
+    def embed_many(self, texts):
+        self.batches.append(list(texts))
+        return super().embed_many(texts)
+
+def test_hash_embedder_is_deterministic():
+    embedder = HashEmbedder(dimensions=16)
+    assert embedder.embed("azure search") == embedder.embed_many(["azure search"])[0]
+    assert embedder.embed("azure search") != embedder.embed("bing grounding")
+
+def test_cache_hits_and_misses():
+    embedder = CachingEmbedder(CountingEmbedder())
+    first = embedder.embed("azure search")
+    assert embedder.embed("  azure   search ") == first
+    assert embedder.stats()["hits"] == 1
+    assert embedder.stats()["misses"] == 1
+    assert embedder.embedder.batches == [["azure search"]]
+
+def test_batch_deduplicates_and_skips_cached_texts():
+    embedder = CachingEmbedder(CountingEmbedder())
+    embedder.embed("cached")
+    vectors = embedder.embed_many(["a", "cached", "a", "b"])
+    assert embedder.embedder.batches == [["cached"], ["a", "b"]]
+    assert vectors[0] == vectors[2]
+
+def test_cache_evicts_least_recently_used():
+    embedder = CachingEmbedder(CountingEmbedder(), EmbeddingCache(maxsize=2))
+    embedder.embed_many(["a", "b"])
+    embedder.embed("a")
+    embedder.embed("c")
+    embedder.embed("b")
+    assert embedder.embedder.batches == [["a", "b"], ["c"], ["b"]]
+
+def test_search_sends_vectorized_query_with_embedder():
+    # Needs azure-search-documents; the search request itself is captured, not sent
+    from azure.search.documents.models import VectorizedQuery
+    from azure_search_client import AzureSearchClient
+
+    class CapturingSearchClient:
+        def search(self, **kwargs):
+            self.kwargs = kwargs
+            return []
+
+    os.environ.setdefault("AZURE_SEARCH_SERVICE_ENDPOINT", "https://example.search.windows.net")
+    os.environ.setdefault("AZURE_SEARCH_INDEX_NAME", "test-index")
+    os.environ.setdefault("AZURE_SEARCH_API_KEY", "test-key")
+    client = AzureSearchClient(embedder=HashEmbedder(dimensions=16))
+    client.search_client = CapturingSearchClient()
+    client.vector_search("azure search", top=3)
+    (vector_query,) = client.search_client.kwargs["vector_queries"]
+    assert isinstance(vector_query, VectorizedQuery)
+    assert vector_query.vector == HashEmbedder(dimensions=16).embed("azure search")
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
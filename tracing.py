@@ -0,0 +1,132 @@
+"""
+Opt-in trace spans for tool calls and Azure client phases.
+
+Set MCP_TRACING=true to enable. Spans go through OpenTelemetry when it is installed
+(OTLP export when OTEL_EXPORTER_OTLP_ENDPOINT is set, otherwise printed to stderr);
+without OpenTelemetry, span timings are logged to stderr. stdout is never used because
+it carries the MCP stdio protocol.
+"""
+
+import os
+import sys
+import time
+import contextlib
+import contextvars
+
+SERVICE_NAME = "mcp-server-azure-ai-agents"
+
+enabled = os.getenv("MCP_TRACING", "false").lower() in ("1", "true", "yes")
+
+_tracer = None
+_propagator = None
+_otel_context = None
+if enabled:
+    try:
+        from opentelemetry import trace, context as _otel_context
+        from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
+        provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        else:
+            provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter(out=sys.stderr)))
+        trace.set_tracer_provider(provider)
+        _tracer = trace.get_tracer(SERVICE_NAME)
+        _propagator = TraceContextTextMapPropagator()
+        print("Tracing enabled (OpenTelemetry)", file=sys.stderr)
+    except ImportError:
+        print("Tracing enabled (OpenTelemetry not installed, logging spans to stderr)", file=sys.stderr)
+
+# Fallback span stack: (trace id, span name) of the current span, per thread/task
+_current = contextvars.ContextVar("mcp_trace_span", default=None)
+
+@contextlib.contextmanager
+def span(name, **attributes):
+    """Time a block as a span named `name`. Does nothing unless tracing is enabled."""
+    if not enabled:
+        yield
+        return
+    if _tracer is not None:
+        with _tracer.start_as_current_span(name, attributes=_clean(attributes)):
+            yield
+        return
+
+    parent = _current.get()
+    trace_id = parent[0] if parent else os.urandom(16).hex()
+    token = _current.set((trace_id, name))
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _current.reset(token)
+        _log(trace_id, name, parent, (time.perf_counter() - started) * 1000, attributes, error)
+
+def record_span(name, start_ns, end_ns, **attributes):
+    """Record a span for a phase that has already finished, from time.time_ns() timestamps."""
+    if not enabled:
+        return
+    if _tracer is not None:
+        _tracer.start_span(name, start_time=start_ns, attributes=_clean(attributes)).end(end_time=end_ns)
+        return
+    parent = _current.get()
+    trace_id = parent[0] if parent else os.urandom(16).hex()
+    _log(trace_id, name, parent, (end_ns - start_ns) / 1e6, attributes, None)
+
+@contextlib.contextmanager
+def remote_parent(carrier):
+    """Make the W3C trace context in `carrier` (keys `traceparent`, `tracestate`) the parent of new spans."""
+    if not enabled or not carrier or not carrier.get("traceparent"):
+        yield
+        return
+    if _propagator is not None:
+        token = _otel_context.attach(_propagator.extract(carrier))
+        try:
+            yield
+        finally:
+            _otel_context.detach(token)
+        return
+    # traceparent is "version-traceid-spanid-flags"
+    parts = carrier["traceparent"].split("-")
+    token = _current.set((parts[1], "remote")) if len(parts) == 4 else None
+    try:
+        yield
+    finally:
+        if token is not None:
+            _current.reset(token)
+
+class TracedCredential:
+    """Wrap a token credential so token acquisition shows up as its own span."""
+
+    def __init__(self, credential):
+        self._credential = credential
+        # azure-core prefers get_token_info when the credential has it
+        if hasattr(credential, "get_token_info"):
+            self.get_token_info = self._get_token_info
+
+    def get_token(self, *scopes, **kwargs):
+        with span("credential.get_token", scopes=",".join(scopes)):
+            return self._credential.get_token(*scopes, **kwargs)
+
+    def _get_token_info(self, *scopes, **kwargs):
+        with span("credential.get_token", scopes=",".join(scopes)):
+            return self._credential.get_token_info(*scopes, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._credential, name)
+
+def _clean(attributes):
+    return {k: v for k, v in attributes.items() if isinstance(v, (str, bool, int, float))}
+
+def _log(trace_id, name, parent, duration_ms, attributes, error):
+    parent_name = parent[1] if parent else "-"
+    attrs = " ".join(f"{k}={v}" for k, v in _clean(attributes).items())
+    status = f" error={type(error).__name__}" if error else ""
+    print(f"[trace {trace_id[:8]}] {name} ({parent_name}) {duration_ms:.1f}ms {attrs}{status}", file=sys.stderr)
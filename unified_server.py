@@ -0,0 +1,332 @@
+"""Unified MCP Server hosting Azure AI Search and Azure AI Agent Service tools in one process."""
+
+import os
+import sys
+import time
+import inspect
+import contextlib
+from dotenv import load_dotenv
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+
+from shared_resources import SharedResources
+from prefetch import Prefetcher
+from workload import WorkloadRecorder
+from profiling import ToolProfiler
+import tracing
+import postprocess
+
+# Add startup message
+print("Starting Unified Azure MCP Server...", file=sys.stderr)
+
+# Load environment variables
+load_dotenv()
+print("Environment variables loaded", file=sys.stderr)
+
+SEARCH_TOOLS = ("keyword_search", "vector_search", "hybrid_search")
+AGENT_TOOLS = ("search_index", "web_search")
+
+# Select the tools to host (default: all of them)
+enabled_tools = [t.strip() for t in os.getenv("UNIFIED_SERVER_TOOLS", ",".join(SEARCH_TOOLS + AGENT_TOOLS)).split(",") if t.strip()]
+unknown_tools = [t for t in enabled_tools if t not in SEARCH_TOOLS + AGENT_TOOLS]
+if unknown_tools:
+    print(f"Error: Unknown tools in UNIFIED_SERVER_TOOLS: {', '.join(unknown_tools)}", file=sys.stderr)
+    sys.exit(1)
+print(f"Enabled tools: {', '.join(enabled_tools)}", file=sys.stderr)
+
+# Create MCP server
+mcp = FastMCP(
+    "azure-unified",
+    description="MCP server for Azure AI Search and Azure AI Agent Service (Bing Web Grounding) tools",
+    dependencies=[
+        "azure-search-documents==11.5.2",
+        "azure-identity",
+        "python-dotenv",
+        "azure-ai-projects"
+    ]
+)
+print("MCP server instance created", file=sys.stderr)
+
+# Shared credential, connection pool and caches
+resources = SharedResources.from_env()
+
+# Optional speculative prefetching of follow-up calls into the result cache
+prefetcher = Prefetcher.from_env(resources.result_cache)
+# Agent runs use the same deployment quota as foreground calls, so they are only prefetched on request
+prefetch_agent_runs = os.getenv("PREFETCH_AGENT_RUNS", "false").lower() in ("1", "true", "yes")
+
+# Optional recording of tool calls for replay with replay_workload.py
+recorder = WorkloadRecorder.from_env()
+
+# Optional per-tool CPU/wall-clock profiles
+profiler = ToolProfiler.from_env()
+
+# Initialize only the clients needed by the enabled tools
+backend = os.getenv("UNIFIED_SERVER_BACKEND", "azure").lower()
+search_client = None
+agent_client = None
+if backend == "fake":
+    # Offline fake backends with simulated latency, for load tests
+    from azure_search_client import format_results_as_markdown
+    from fake_backends import FakeSearchClient, FakeAgentClient
+    print("Using fake backends", file=sys.stderr)
+    search_client = FakeSearchClient.from_env()
+    agent_client = FakeAgentClient.from_env()
+elif any(t in SEARCH_TOOLS for t in enabled_tools):
+    try:
+        from azure_search_client import AzureSearchClient, format_results_as_markdown
+        print("Starting initialization of search client...", file=sys.stderr)
+        search_client = AzureSearchClient(
+            embedder=resources.embedder,
+            credential=None if os.getenv("AZURE_SEARCH_API_KEY") else resources.credential,
+            transport=resources.transport()
+        )
+        print("Search client initialized successfully", file=sys.stderr)
+    except Exception as e:
+        print(f"Error initializing search client: {str(e)}", file=sys.stderr)
+        # Don't exit - we'll handle errors in the tool functions
+
+if backend != "fake" and any(t in AGENT_TOOLS for t in enabled_tools):
+    try:
+        from azure_agent_client import AzureAIAgentClient
+        print("Starting initialization of agent client...", file=sys.stderr)
+        agent_client = AzureAIAgentClient(credential=resources.credential, transport=resources.transport())
+        print("Agent client initialized successfully", file=sys.stderr)
+    except Exception as e:
+        print(f"Error initializing agent client: {str(e)}", file=sys.stderr)
+        # Don't exit - we'll handle errors in the tool functions
+
+def _execute(tool_name, args):
+    """
+    Call the backend for a tool and format its result; raises on backend errors.
+
+    Returns:
+        (markdown, number of results the backend returned, or None for agent tools)
+    """
+    if tool_name == "keyword_search":
+        query, top, skip = args
+        results = search_client.keyword_search(query, top, skip=skip)
+        return format_results_as_markdown(results, "Keyword Search"), len(results)
+    if tool_name == "vector_search":
+        query, top, skip = args
+        results = search_client.vector_search(query, top, skip=skip)
+        return format_results_as_markdown(results, "Vector Search"), len(results)
+    if tool_name == "hybrid_search":
+        query, top, skip = args
+        results = search_client.hybrid_search(query, top, skip=skip)
+        return format_results_as_markdown(results, "Hybrid Search"), len(results)
+    if tool_name == "search_index":
+        query, top = args
+        return f"## Azure AI Search Results\n\n{agent_client.search_index(query, top)}", None
+    if tool_name == "web_search":
+        (query,) = args
+        return f"## Bing Web Search Results\n\n{agent_client.web_search(query)}", None
+    raise ValueError(f"Unknown tool: {tool_name}")
+
+def _follow_up_calls(tool_name, args, count):
+    """
+    Likely next calls after `tool_name(*args)`: the next page, and the same query on the other backend.
+
+    The next page is only prefetched when this page was full (`count` results out of `top`),
+    and agent runs only with PREFETCH_AGENT_RUNS set.
+    """
+    query = args[0]
+    calls = []
+    if tool_name in SEARCH_TOOLS:
+        _, top, skip = args
+        if count is not None and count >= top:
+            calls.append((tool_name, (query, top, skip + top)))
+        calls.append(("web_search", (query,)))
+    elif tool_name == "search_index":
+        calls.append(("web_search", (query,)))
+    elif tool_name == "web_search":
+        calls.append(("hybrid_search", (query, 5, 0)) if "hybrid_search" in enabled_tools else ("search_index", (query, 5)))
+    return [(name, call_args) for name, call_args in calls
+            if name in enabled_tools and (prefetch_agent_runs or name not in AGENT_TOOLS)]
+
+def _trace_carrier():
+    """Return the W3C trace context the MCP client sent in the request's _meta, if any."""
+    try:
+        meta = mcp.get_context().request_context.meta
+    except (LookupError, ValueError):
+        return None
+    if meta is None:
+        return None
+    return {k: v for k, v in (("traceparent", getattr(meta, "traceparent", None)),
+                              ("tracestate", getattr(meta, "tracestate", None))) if v}
+
+def _run_tool(tool_name, args, error_label):
+    """
+    Run a tool call in a span parented to the caller's trace context.
+
+    Failures are raised as ToolError so the MCP response is flagged with isError,
+    and the workload recorder logs the call's actual outcome.
+    """
+    started = time.monotonic()
+    with tracing.remote_parent(_trace_carrier()):
+        with tracing.span(f"tool.{tool_name}", query=args[0]):
+            if tool_name in SEARCH_TOOLS and search_client is None:
+                result, error = None, "Error: Azure Search client is not initialized. Check server logs for details."
+            elif tool_name in AGENT_TOOLS and agent_client is None:
+                result, error = None, "Error: Azure AI Agent client is not initialized. Check server logs for details."
+            else:
+                result, error = _run_cached(tool_name, args, error_label)
+
+    if recorder is not None:
+        arg_names = inspect.signature(TOOLS[tool_name]).parameters
+        recorder.record_call(tool_name, dict(zip(arg_names, args)), started,
+                             len((result if error is None else error).encode("utf-8")), error is not None)
+    if error is not None:
+        raise ToolError(error)
+    return result
+
+def _run_cached(tool_name, args, error_label):
+    """
+    Run a tool call through the shared result cache; errors are not cached.
+
+    Returns:
+        (result, None) on success, or (None, error message) on failure
+    """
+    key = (tool_name,) + tuple(args)
+    cached = resources.result_cache.get(key)
+    if cached is not None:
+        print(f"Cache hit for {tool_name}{tuple(args)}", file=sys.stderr)
+        if prefetcher is not None:
+            prefetcher.record_hit(key)
+        return cached, None
+
+    if prefetcher is not None:
+        prefetcher.foreground_started()
+    try:
+        # Join a prefetch of this call that is still running instead of repeating it.
+        # The result count of a joined prefetch is unknown, so its next page is not prefetched.
+        result, count = (prefetcher.join(key) if prefetcher is not None else None), None
+        if result is None:
+            with profiler.profile(tool_name) if profiler is not None else contextlib.nullcontext():
+                result, count = _execute(tool_name, args)
+    except Exception as e:
+        error_msg = f"Error performing {error_label}: {str(e)}"
+        print(error_msg, file=sys.stderr)
+        return None, error_msg
+    finally:
+        if prefetcher is not None:
+            prefetcher.foreground_finished()
+    resources.result_cache.put(key, result)
+
+    if prefetcher is not None:
+        for next_tool, next_args in _follow_up_calls(tool_name, args, count):
+            prefetcher.schedule((next_tool,) + next_args,
+                                lambda next_tool=next_tool, next_args=next_args: _execute(next_tool, next_args)[0])
+    return result, None
+
+def keyword_search(query: str, top: int = 5, skip: int = 0) -> str:
+    """
+    Perform a keyword-based search on the Azure AI Search index.
+
+    Args:
+        query: The search query text
+        top: Maximum number of results to return (default: 5)
+        skip: Number of results to skip, for paging (default: 0)
+
+    Returns:
+        Formatted search results
+    """
+    print(f"Tool called: keyword_search({query}, {top}, {skip})", file=sys.stderr)
+    return _run_tool("keyword_search", (query, top, skip), "keyword search")
+
+def vector_search(query: str, top: int = 5, skip: int = 0) -> str:
+    """
+    Perform a vector similarity search on the Azure AI Search index.
+
+    Args:
+        query: The search query text
+        top: Maximum number of results to return (default: 5)
+        skip: Number of results to skip, for paging (default: 0)
+
+    Returns:
+        Formatted search results
+    """
+    print(f"Tool called: vector_search({query}, {top}, {skip})", file=sys.stderr)
+    return _run_tool("vector_search", (query, top, skip), "vector search")
+
+def hybrid_search(query: str, top: int = 5, skip: int = 0) -> str:
+    """
+    Perform a hybrid search (keyword + vector) on the Azure AI Search index.
+
+    Args:
+        query: The search query text
+        top: Maximum number of results to return (default: 5)
+        skip: Number of results to skip, for paging (default: 0)
+
+    Returns:
+        Formatted search results
+    """
+    print(f"Tool called: hybrid_search({query}, {top}, {skip})", file=sys.stderr)
+    return _run_tool("hybrid_search", (query, top, skip), "hybrid search")
+
+def search_index(query: str, top: int = 5) -> str:
+    """
+    Search your Azure AI Search index using the optimal retrieval method.
+
+    Args:
+        query: The search query text
+        top: Maximum number of results to return (default: 5)
+
+    Returns:
+        Formatted search results from your indexed documents
+    """
+    print(f"Tool called: search_index({query}, {top})", file=sys.stderr)
+    return _run_tool("search_index", (query, top), "index search")
+
+def web_search(query: str) -> str:
+    """
+    Search the web using Bing Web Grounding to find the most current information.
+
+    Args:
+        query: The search query text
+
+    Returns:
+        Formatted search results from the web with citations
+    """
+    print(f"Tool called: web_search({query})", file=sys.stderr)
+    return _run_tool("web_search", (query,), "web search")
+
+def prefetch_stats() -> str:
+    """
+    Report speculative prefetch counters: issued, completed, used by later calls, unused and dropped.
+
+    Returns:
+        Prefetch statistics as Markdown
+    """
+    stats = prefetcher.stats()
+    markdown = "## Prefetch Statistics\n\n"
+    for name, value in stats.items():
+        markdown += f"- {name}: {value}\n"
+    return markdown
+
+# Register the enabled tools
+TOOLS = {
+    "keyword_search": keyword_search,
+    "vector_search": vector_search,
+    "hybrid_search": hybrid_search,
+    "search_index": search_index,
+    "web_search": web_search,
+}
+for tool_name in enabled_tools:
+    mcp.add_tool(TOOLS[tool_name])
+if prefetcher is not None:
+    mcp.add_tool(prefetch_stats)
+
+if __name__ == "__main__":
+    # Run the server with stdio transport (default)
+    print("Starting MCP server run...", file=sys.stderr)
+    try:
+        mcp.run()
+    finally:
+        if prefetcher is not None:
+            print(f"Prefetch statistics: {prefetcher.stats()}", file=sys.stderr)
+            prefetcher.shutdown()
+        if recorder is not None:
+            recorder.close()
+        print(f"Post-processing statistics: {postprocess.stats.snapshot()}", file=sys.stderr)
+        resources.close()
@@ -0,0 +1,126 @@
+"""Record MCP tool calls to a compact workload log for later replay."""
+
+import os
+import sys
+import json
+import gzip
+import zlib
+import time
+import threading
+
+def _open_log(path, mode):
+    """Open a workload log, gzip-compressed when the path ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def _run_log_path(path, started):
+    """
+    Return the path one recording run should write to.
+
+    A killed server leaves its gzip stream without a trailer, and a gzip member appended
+    after that can't be read, so .gz logs are never appended to: when `path` exists, the
+    run writes to a new file named after its start time instead.
+    """
+    if not path.endswith(".gz") or not os.path.exists(path):
+        return path
+    stem, ext = path[:-len(".jsonl.gz")], ".jsonl.gz"
+    if not path.endswith(ext):
+        stem, ext = path[:-len(".gz")], ".gz"
+    run_path = f"{stem}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}{ext}"
+    n = 1
+    while os.path.exists(run_path):
+        n += 1
+        run_path = f"{stem}-{time.strftime('%Y%m%d-%H%M%S', time.localtime(started))}-{n}{ext}"
+    return run_path
+
+class WorkloadRecorder:
+    """
+    Append one JSON line per tool call: the session (wall-clock start of the recording run,
+    `s`), start offset in seconds within that session (`t`), tool name, arguments, duration
+    in milliseconds (`ms`), response size in bytes and whether the call errored.
+    """
+
+    def __init__(self, path):
+        self.session = round(time.time(), 3)
+        self.path = _run_log_path(path, self.session)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = _open_log(self.path, "a")
+
+    @classmethod
+    def from_env(cls):
+        """Create a recorder writing to WORKLOAD_RECORD_FILE, or return None if it is unset."""
+        path = os.getenv("WORKLOAD_RECORD_FILE")
+        if not path:
+            return None
+        recorder = cls(path)
+        print(f"Recording tool calls to {recorder.path}", file=sys.stderr)
+        return recorder
+
+    def record(self, tool, args, offset, duration, response_size, error):
+        """Write one call record."""
+        line = json.dumps({
+            "s": self.session,
+            "t": round(offset, 3),
+            "tool": tool,
+            "args": args,
+            "ms": round(duration * 1000, 1),
+            "bytes": response_size,
+            "err": error
+        }, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def record_call(self, tool, args, started, response_size, error):
+        """
+        Record a finished tool call.
+
+        Args:
+            tool: Tool name
+            args: Tool arguments by name
+            started: time.monotonic() when the call started
+            response_size: Size of the response (or error message) in bytes
+            error: Whether the backend call failed
+        """
+        self.record(tool, args, started - self._started, time.monotonic() - started, response_size, error)
+
+    def close(self):
+        """Close the log file."""
+        with self._lock:
+            self._file.close()
+
+def load_workload(path):
+    """
+    Load the call records of a workload log, ordered by session and by start offset within
+    each session. Plain logs may hold several appended recording runs; offsets restart at 0
+    in each one.
+
+    Servers are usually killed by their client, so a run may end in a partial line or, for
+    .gz logs, a missing gzip trailer. Unreadable gzip data ends loading and partial lines
+    are skipped; every complete record before them is kept.
+    """
+    records = []
+    skipped = 0
+    with _open_log(path, "r") as f:
+        while True:
+            try:
+                line = f.readline()
+            except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+                print(f"Workload log {path} is truncated ({e}); loaded {len(records)} complete records",
+                      file=sys.stderr)
+                break
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Partial line from a run that was killed mid-write
+                skipped += 1
+    if skipped:
+        print(f"Skipped {skipped} partial line(s) in workload log {path}", file=sys.stderr)
+    # Logs written before sessions were recorded hold a single run
+    return sorted(records, key=lambda record: (record.get("s", 0), record["t"]))